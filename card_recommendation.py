@@ -1,82 +1,141 @@
 import random
-from typing import List, Dict, Any
-from gamemain import create_base_deck, Game, GameState, Card, Phase
+from typing import List, Dict, Any, Optional, Tuple
+from gamemain import create_base_deck, Game, GameState, Phase, B_PLAY, B_FOCUS, B_MOOD, CARD_DEFS
+
+_random = random.random
+
+# 状态键字段的偏移量: 集中/好调/元气可能为负，加上偏移后落在[0, 2^16)，分数落在[0, 2^32)
+_BIAS16 = 1 << 15
+_BIAS32 = 1 << 31
+
+def _td_update(prev_q: List[float], card_id: int, reward: float, curr_q: List[float],
+               learning_rate: float, discount_factor: float) -> None:
+    """单步Q-learning更新，直接写回前一状态的Q值行"""
+    current_q = prev_q[card_id]
+    prev_q[card_id] = current_q + learning_rate * (
+        reward + discount_factor * max(curr_q) - current_q
+    )
+
+def _argmax_over_hand(q_row: List[float], hand: List[int]) -> int:
+    """返回手牌中Q值最高的卡牌下标，Q值相同时取靠前的"""
+    best_index = 0
+    best_q = q_row[hand[0]]
+    for i in range(1, len(hand)):
+        q = q_row[hand[i]]
+        if q > best_q:
+            best_q = q
+            best_index = i
+    return best_index
 
 class CardRecommendationAgent:
-    def __init__(self, deck: List[Card], learning_rate=0.1, discount_factor=0.9, exploration_rate=0.1):
+    def __init__(self, deck: List[int], learning_rate=0.1, discount_factor=0.9, exploration_rate=0.1):
         """
         初始化卡牌推荐强化学习智能体
         
-        :param deck: 游戏卡组
+        :param deck: 游戏卡组(卡牌ID列表)
         :param learning_rate: 学习率
         :param discount_factor: 折扣因子
         :param exploration_rate: 探索率
         """
         self.deck = deck
-        self.q_table = {}  # Q-table存储状态-动作对的期望价值
+        # Q-table存储状态-动作对的期望价值: 每个状态一行，按卡牌ID索引列
+        self.num_cards = max(deck, default=-1) + 1
+        # 行保持普通float列表不做量化: array/float16逐元素读取都要装箱成新的float，反而拖慢max()和更新
+        self.q_table: List[List[float]] = []
+        self.state_index: Dict[int, int] = {}  # 状态键 -> Q表行号
         self.learning_rate = learning_rate
         self.discount_factor = discount_factor
         self.exploration_rate = exploration_rate
 
-    def get_state_key(self, game_state: GameState) -> str:
+    def get_state_key(self, game_state: GameState) -> int:
         """
-        将游戏状态转换为可哈希的状态键
+        将游戏状态打包为一个整数状态键
+        
+        位布局(低位到高位): 回合16位 | 集中16位 | 好调16位 | 元气16位 | 分数32位 | 体力(其余高位)
+        集中、好调、元气和分数加上偏移量存为非负数，超出字段宽度时报错，保证不同状态的键不同。
+        体力可能扣成负数，放在最高位，Python整数不限长度，不会影响低位字段
         
         :param game_state: 游戏状态
-        :return: 状态的字符串表示
+        :return: 状态的整数表示
+        """
+        buffs = game_state.buffs
+        current_round = game_state.current_round
+        focus = buffs[B_FOCUS] + _BIAS16
+        mood = buffs[B_MOOD] + _BIAS16
+        spirit = game_state.spirit + _BIAS16
+        score = game_state.score + _BIAS32
+        # 负数右移后为-1，超宽右移后非0，一次检查覆盖所有越界情况
+        if (current_round | focus | mood | spirit) >> 16 or score >> 32:
+            raise ValueError(
+                f"状态超出状态键的字段范围: 回合{current_round} 集中{buffs[B_FOCUS]} "
+                f"好调{buffs[B_MOOD]} 元气{game_state.spirit} 分数{game_state.score}"
+            )
+        return (current_round
+                | focus << 16
+                | mood << 32
+                | spirit << 48
+                | score << 64
+                | game_state.vitality << 96)
+
+    def get_state_index(self, state_key: int) -> int:
+        """
+        获取状态键对应的Q表行号，新状态追加一行全0
+        
+        :param state_key: 状态键
+        :return: Q表行号
         """
-        return f"round:{game_state.current_round}_score:{game_state.score}_spirit:{game_state.spirit}_vitality:{game_state.vitality}_focus:{game_state.buffs.get('集中', 0)}_mood:{game_state.buffs.get('好调', 0)}"
+        index = self.state_index.get(state_key)
+        if index is None:
+            index = len(self.q_table)
+            self.state_index[state_key] = index
+            self.q_table.append([0.0] * self.num_cards)
+        return index
 
-    def choose_card(self, game_state: GameState) -> Card:
+    def choose_card(self, game_state: GameState,
+                    q_row: Optional[List[float]] = None) -> Tuple[Optional[int], int]:
         """
         根据Q-learning选择最佳卡牌
         
         :param game_state: 当前游戏状态
-        :return: 选择的卡牌
+        :param q_row: 当前状态已取出的Q值行，传入时不再重新计算状态键
+        :return: 选择的卡牌ID及其在手牌中的下标
         """
         # 如果没有手牌，返回None
         if not game_state.hand:
-            return None
-
-        state_key = self.get_state_key(game_state)
-
-        # 探索与利用平衡
-        if random.random() < self.exploration_rate:
-            return random.choice(game_state.hand)
+            return None, -1
 
-        # 如果该状态没有记录，初始化
-        if state_key not in self.q_table:
-            self.q_table[state_key] = {card.name: 0 for card in game_state.hand}
+        # 探索与利用平衡: 先掷探索，随机出牌用不到状态键
+        roll = _random()
+        if roll < self.exploration_rate:
+            # roll在[0, 探索率)内均匀分布，缩放后直接复用来挑随机手牌，省一次随机数
+            hand_size = len(game_state.hand)
+            index = min(int(roll / self.exploration_rate * hand_size), hand_size - 1)
+            return game_state.hand[index], index
 
         # 选择Q值最高的卡牌
-        q_values = self.q_table[state_key]
-        best_card = max(game_state.hand, key=lambda card: q_values.get(card.name, 0))
-        return best_card
+        if q_row is None:
+            q_row = self.q_table[self.get_state_index(self.get_state_key(game_state))]
+        index = _argmax_over_hand(q_row, game_state.hand)
+        return game_state.hand[index], index
 
-    def update_q_table(self, prev_state: str, card: Card, reward: float, curr_state: str):
+    def update_q_table(self, prev_state: int, card_id: int, reward: float,
+                       curr_state: int) -> List[float]:
         """
         更新Q-table
         
         :param prev_state: 前一个状态
-        :param card: 选择的卡牌
+        :param card_id: 选择的卡牌ID
         :param reward: 即时奖励
         :param curr_state: 当前状态
+        :return: 当前状态的Q值行，可直接传给choose_card选下一张牌
         """
-        # 如果状态不存在，初始化
-        if prev_state not in self.q_table:
-            self.q_table[prev_state] = {card.name: 0 for card in self.deck}
-        if curr_state not in self.q_table:
-            self.q_table[curr_state] = {card.name: 0 for card in self.deck}
-
+        curr_q = self.q_table[self.get_state_index(curr_state)]
         # Q-learning更新公式
-        current_q = self.q_table[prev_state].get(card.name, 0)
-        max_next_q = max(self.q_table[curr_state].values())
-        
-        new_q = current_q + self.learning_rate * (
-            reward + self.discount_factor * max_next_q - current_q
+        _td_update(
+            self.q_table[self.get_state_index(prev_state)], card_id, reward, curr_q,
+            self.learning_rate, self.discount_factor
         )
-        
-        self.q_table[prev_state][card.name] = new_q
+        return curr_q
 
     def train(self, num_episodes=1000, num_rounds=9, target_score=90):
         """
@@ -86,6 +145,10 @@ class CardRecommendationAgent:
         :param num_rounds: 每局游戏的最大回合数
         :param target_score: 目标分数
         """
+        # 状态键中回合只占16位，提前检查，免得打到越界的回合才报错
+        if num_rounds >= 1 << 16:
+            raise ValueError(f"num_rounds不能超过{(1 << 16) - 1}: {num_rounds}")
+
         training_results = {
             'total_episodes': num_episodes,
             'successful_episodes': 0,
@@ -93,25 +156,28 @@ class CardRecommendationAgent:
             'total_final_score': 0
         }
 
-        for episode in range(num_episodes):
-            # 创建游戏实例，完全遵循游戏初始化逻辑
-            game_state = GameState(
-                deck=self.deck, 
-                num_rounds=num_rounds, 
-                target_score=target_score, 
-                max_hand_size=5, 
-                starting_vitality=30
-            )
+        # 整个训练过程复用同一个游戏实例，构造时已发好第一局的牌，每局结束后原地重置
+        game_state = GameState(
+            deck=self.deck, 
+            num_rounds=num_rounds, 
+            target_score=target_score, 
+            max_hand_size=5, 
+            starting_vitality=30,
+            enable_log=False
+        )
 
-            # 记录每回合的状态和动作
-            episode_states = []
-            episode_actions = []
-            episode_rewards = []
+        # 实例复用后手牌/buff容器在整个训练中不变，循环外绑定一次，
+        # 省去每次出牌的属性和方法查找(弃牌堆洗牌时会与抽牌堆互换，不能绑定)
+        hand = game_state.hand
+        buffs = game_state.buffs
+        q_table = self.q_table
+        choose_card = self.choose_card
+        get_state_key = self.get_state_key
+        update_q_table = self.update_q_table
 
+        for episode in range(num_episodes):
             # 完全模拟游戏流程
-            while (game_state.current_round <= game_state.num_rounds and 
-                   game_state.score < game_state.target_score and
-                   game_state.vitality > 0):
+            while game_state.alive:
                 
                 # 回合开始阶段 - 完全遵循游戏逻辑
                 game_state.current_phase = Phase.TURN_START
@@ -120,47 +186,44 @@ class CardRecommendationAgent:
                 # 玩家操作阶段
                 game_state.current_phase = Phase.PLAYER_ACTION
                 
-                # 记录回合初始状态
-                prev_state_key = self.get_state_key(game_state)
+                # 记录回合初始状态，并取出该状态的Q值行
+                # 之后每次出牌只在效果结算后计算一次新状态键，选牌和更新Q表共用
+                state_key = get_state_key(game_state)
+                q_row = q_table[self.get_state_index(state_key)]
 
                 # 出牌阶段
-                while game_state.buffs["出牌机会"] > 0 and game_state.hand:
-                    # 使用智能体选择卡牌
-                    selected_card = self.choose_card(game_state)
+                while buffs[B_PLAY] > 0 and hand:
+                    # 使用智能体选择卡牌，Q值行只在状态变化(出牌)后重新获取
+                    card_id, card_index = choose_card(game_state, q_row)
                     
-                    if not selected_card:
+                    if card_id is None:
                         break
 
-                    # 记录选择的卡牌
-                    episode_actions.append(selected_card.name)
-
-                    # 应用卡牌效果
-                    log_entries = selected_card.apply_effects(game_state)
+                    # 应用卡牌效果，训练不需要日志，走缓存增量的快速路径
+                    CARD_DEFS[card_id].apply_effects_fast(game_state)
 
-                    # 记录当前状态
-                    curr_state_key = self.get_state_key(game_state)
+                    # 记录出牌后的新状态
+                    new_state_key = get_state_key(game_state)
 
                     # 计算奖励 - 这里可以更复杂地设计奖励
                     reward = game_state.score  # 简单地使用分数作为奖励
-                    episode_rewards.append(reward)
 
-                    # 更新Q表
-                    self.update_q_table(prev_state_key, selected_card, reward, curr_state_key)
+                    # 更新Q表，顺带拿到新状态的Q值行供下一次选牌
+                    q_row = update_q_table(state_key, card_id, reward, new_state_key)
+                    state_key = new_state_key
 
-                    # 移除已使用的卡牌
-                    game_state.hand.remove(selected_card)
-                    game_state.discard_pile.append(selected_card)
+                    # 移除已使用的卡牌: 末尾的牌补到空位，O(1)删除
+                    hand[card_index] = hand[-1]
+                    hand.pop()
+                    game_state.discard_pile.append(card_id)
                     
                     # 减少出牌机会
-                    game_state.buffs["出牌机会"] -= 1
-
-                    # 更新前一个状态
-                    prev_state_key = curr_state_key
+                    buffs[B_PLAY] -= 1
 
                 # 回合结束阶段
                 game_state.current_phase = Phase.TURN_END
                 game_state.reset_for_new_round()
-                game_state.current_round += 1
+                game_state.next_round()
 
             # 记录训练结果
             training_results['total_final_score'] += game_state.score
@@ -171,6 +234,8 @@ class CardRecommendationAgent:
             if (episode + 1) % 100 == 0:
                 print(f"Episode {episode + 1}/{num_episodes} completed. Final score: {game_state.score}")
 
+            game_state.reset()
+
         # 计算平均分数
         training_results['average_final_score'] = training_results['total_final_score'] / num_episodes
 
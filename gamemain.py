@@ -1,8 +1,7 @@
 from dataclasses import dataclass
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from enum import Enum
 import random
-import math
 
 class Phase(Enum):
     TURN_START = "回合开始阶段"
@@ -28,6 +27,49 @@ class Effect:
     value: int
     bypass_spirit: bool = False
  
+# 效果操作码，Card构造时把效果列表预编译成(操作码, 数值, 名称)
+OP_DAMAGE, OP_SPIRIT, OP_FOCUS, OP_MOOD, OP_PLAY_COUNT = range(5)
+EFFECT_OPCODES: Dict[EffectType, int] = {
+    EffectType.DAMAGE: OP_DAMAGE,
+    EffectType.SPIRIT: OP_SPIRIT,
+    EffectType.FOCUS: OP_FOCUS,
+    EffectType.MOOD: OP_MOOD,
+    EffectType.PLAY_COUNT: OP_PLAY_COUNT
+}
+
+# Buff下标，GameState.buffs/new_buffs按下标存取，名称见BUFF_NAMES
+B_PLAY, B_FOCUS, B_MOOD = 0, 1, 2
+BUFF_NAMES = ("出牌机会", "集中", "好调")
+
+def _random_key(_card_id: int) -> float:
+    """洗牌用排序键。牌堆只有十几张，按随机键排序比random.shuffle逐张取随机数更快"""
+    return random.random()
+
+# 关闭日志时各方法共用的空日志列表，只读不写
+_NO_LOGS: List[str] = []
+
+# 卡牌名 -> 整数ID，同名卡牌共用一个ID，供Q表按列索引
+CARD_IDS: Dict[str, int] = {}
+
+# 卡牌ID -> 卡牌定义。卡牌定义登记后不再修改，牌堆和手牌里只存卡牌ID
+CARD_DEFS: List['Card'] = []
+
+def register_card(card: 'Card') -> 'Card':
+    """登记卡牌定义并分配卡牌ID，返回实际生效的定义
+    
+    同名卡牌已登记且定义相同时返回已登记的定义(保留其效果缓存)，
+    定义不同则报错，避免悄悄改变已有卡组里同一ID的规则
+    """
+    card_id = CARD_IDS.get(card.name)
+    if card_id is None:
+        card.card_id = CARD_IDS[card.name] = len(CARD_DEFS)
+        CARD_DEFS.append(card)
+        return card
+    registered = CARD_DEFS[card_id]
+    if not registered.same_definition(card):
+        raise ValueError(f"卡牌 {card.name} 已登记为不同的定义")
+    return registered
+
 class CardTemplate:
     name: str
     effects: List[Dict]
@@ -37,40 +79,53 @@ class CardTemplate:
     shuffle_priority: float = 0
 
 def create_card_from_template(template: CardTemplate) -> 'Card':
-    """从模板创建卡牌实例"""
+    """从模板创建卡牌并登记，返回已登记的卡牌定义"""
     traits = template.traits or []
-    return Card(
+    return register_card(Card(
         name=template.name,
         effects=template.effects,
         cost=template.cost,
         bypass_spirit=CardTrait.BYPASS_SPIRIT.value in traits,
         shuffle_priority=template.shuffle_priority,
         exhaust=CardTrait.EXHAUST.value in traits
-    )
+    ))
 
 class Card:
     def __init__(self, name: str, effects: List[Dict], cost: int, bypass_spirit: bool = False, 
                  shuffle_priority: float = 0, exhaust: bool = False):  # 新增 exhaust 参数
         self.name = name
+        self.card_id: Optional[int] = None  # register_card登记后分配
         self.effects = []
         for effect in effects:
             bypass = effect.get("bypass_spirit", False)
             self.effects.append(Effect(EffectType(effect["type"]), effect["value"], bypass))
+        # 出牌时只遍历预编译的操作码，未实现的效果类型直接跳过
+        self._ops = [(EFFECT_OPCODES[effect.type], effect.value, effect.type.value)
+                     for effect in self.effects if effect.type in EFFECT_OPCODES]
         self.cost = cost
         self.bypass_spirit = bypass_spirit
         self.shuffle_priority = shuffle_priority
         self.exhaust = exhaust  # 消耗
-        self.shuffle_random = 0  # 洗牌用
+        # (集中, 好调) -> 效果增量，见apply_effects_fast
+        self._delta_cache: Dict[Tuple[int, int], Tuple[int, int, int, int, int, bool]] = {}
+
+    def same_definition(self, other: 'Card') -> bool:
+        """判断两张卡牌的名称、效果、消耗及特性是否完全相同"""
+        return (self.name == other.name and self.effects == other.effects
+                and self.cost == other.cost and self.bypass_spirit == other.bypass_spirit
+                and self.shuffle_priority == other.shuffle_priority and self.exhaust == other.exhaust)
     
     def apply_cost(self, game_state: 'GameState') -> List[str]:
         """应用卡牌消耗，优先消耗元气，元气不足时消耗体力"""
-        log_entries = []
+        enable_log = game_state.enable_log
+        log_entries = [] if enable_log else _NO_LOGS
         remaining_cost = self.cost
         
         # 如果卡牌设置了无视元气，直接消耗体力
         if self.bypass_spirit:
             game_state.vitality -= remaining_cost
-            log_entries.append(f"消耗体力 {remaining_cost}")
+            if enable_log:
+                log_entries.append(f"消耗体力 {remaining_cost}")
             return log_entries
             
         # 优先消耗元气
@@ -78,128 +133,235 @@ class Card:
             spirit_reduction = min(game_state.spirit, remaining_cost)
             game_state.spirit -= spirit_reduction
             remaining_cost -= spirit_reduction
-            log_entries.append(f"消耗元气 {spirit_reduction}")
+            if enable_log:
+                log_entries.append(f"消耗元气 {spirit_reduction}")
             
         # 如果还有剩余消耗，扣除体力
         if remaining_cost > 0:
             game_state.vitality -= remaining_cost
-            log_entries.append(f"消耗体力 {remaining_cost}")
+            if enable_log:
+                log_entries.append(f"消耗体力 {remaining_cost}")
             
         return log_entries
 
     def apply_effects(self, game_state: 'GameState') -> List[str]:
-        log_entries = []
+        enable_log = game_state.enable_log
         
-        # 先处理消耗
-        cost_logs = self.apply_cost(game_state)
-        log_entries.extend(cost_logs)
+        # 先处理消耗，关闭日志时返回的是共用空列表
+        log_entries = self.apply_cost(game_state)
         
-        for effect in self.effects:
-            if effect.type == EffectType.DAMAGE:
-                focus_bonus = game_state.buffs.get("集中", 0)
-                base_damage = effect.value + focus_bonus
+        buffs = game_state.buffs
+        for op, value, label in self._ops:
+            if op == OP_DAMAGE:
+                focus_bonus = buffs[B_FOCUS]
+                base_damage = value + focus_bonus
                 
-                # 好调加成计算
-                mood_bonus = game_state.buffs.get("好调", 0)
+                # 好调加成计算: ×1.5向下取整，用整数运算(base*3)>>1
+                mood_bonus = buffs[B_MOOD]
                 if mood_bonus > 0:
-                    actual_damage = math.floor(base_damage * 1.5)
-                    log_entry = f"{effect.type.value}{effect.value}"
-                    if focus_bonus:
-                        log_entry += f"{focus_bonus:+}"
-                    log_entry += f"×1.5(好调)={actual_damage}"
+                    actual_damage = (base_damage * 3) >> 1
                 else:
                     actual_damage = base_damage
-                    log_entry = f"{effect.type.value}{effect.value}"
+                game_state.score += actual_damage
+                
+                if enable_log:
+                    log_entry = f"{label}{value}"
                     if focus_bonus:
                         log_entry += f"{focus_bonus:+}"
-                    log_entry += f"={actual_damage}"
-                
-                game_state.score += actual_damage
-                log_entries.append(log_entry)
+                    if mood_bonus > 0:
+                        log_entry += f"×1.5(好调)={actual_damage}"
+                    else:
+                        log_entry += f"={actual_damage}"
+                    log_entries.append(log_entry)
                 
-            elif effect.type == EffectType.SPIRIT:
-                actual_spirit = effect.value
-                game_state.spirit += actual_spirit
-                log_entries.append(f"{effect.type.value}{actual_spirit:+}={game_state.spirit}")
+            elif op == OP_SPIRIT:
+                game_state.spirit += value
+                if enable_log:
+                    log_entries.append(f"{label}{value:+}={game_state.spirit}")
                 
-            elif effect.type == EffectType.FOCUS:
-                current_focus = game_state.buffs.get("集中", 0)
-                game_state.buffs["集中"] = current_focus + effect.value
-                log_entries.append(f"{effect.type.value}{effect.value:+}={game_state.buffs['集中']}")
+            elif op == OP_FOCUS:
+                buffs[B_FOCUS] += value
+                if enable_log:
+                    log_entries.append(f"{label}{value:+}={buffs[B_FOCUS]}")
                 
-            elif effect.type == EffectType.MOOD:
-                current_mood = game_state.buffs.get("好调", 0)
-                was_zero = current_mood == 0
-                game_state.buffs["好调"] = current_mood + effect.value
-                if was_zero and game_state.buffs["好调"] > 0:
-                    game_state.new_buffs["好调"] = True
-                    log_entries.append(f"{effect.type.value}{effect.value:+}={game_state.buffs['好调']} (新获得)")
-                else:
-                    log_entries.append(f"{effect.type.value}{effect.value:+}={game_state.buffs['好调']}")
+            elif op == OP_MOOD:
+                was_zero = buffs[B_MOOD] == 0
+                buffs[B_MOOD] += value
+                if was_zero and buffs[B_MOOD] > 0:
+                    game_state.new_buffs[B_MOOD] = True
+                    if enable_log:
+                        log_entries.append(f"{label}{value:+}={buffs[B_MOOD]} (新获得)")
+                elif enable_log:
+                    log_entries.append(f"{label}{value:+}={buffs[B_MOOD]}")
                 
-            elif effect.type == EffectType.PLAY_COUNT:
-                game_state.buffs["出牌机会"] += effect.value
-                log_entries.append(f"{effect.type.value}{effect.value:+}")
+            elif op == OP_PLAY_COUNT:
+                buffs[B_PLAY] += value
+                if enable_log:
+                    log_entries.append(f"{label}{value:+}")
 
+        game_state.update_alive()
         return log_entries
 
+    def _compute_deltas(self, focus: int, mood: int) -> Tuple[int, int, int, int, int, bool]:
+        """按apply_effects的规则计算出牌效果带来的增量
+        
+        返回 (分数, 元气, 集中, 好调, 出牌机会, 是否新获得好调)
+        """
+        d_score = d_spirit = d_play_count = 0
+        curr_focus, curr_mood = focus, mood
+        mood_gained = False
+        for op, value, label in self._ops:
+            if op == OP_DAMAGE:
+                base_damage = value + curr_focus
+                d_score += (base_damage * 3) >> 1 if curr_mood > 0 else base_damage
+            elif op == OP_SPIRIT:
+                d_spirit += value
+            elif op == OP_FOCUS:
+                curr_focus += value
+            elif op == OP_MOOD:
+                if curr_mood == 0 and curr_mood + value > 0:
+                    mood_gained = True
+                curr_mood += value
+            elif op == OP_PLAY_COUNT:
+                d_play_count += value
+        return d_score, d_spirit, curr_focus - focus, curr_mood - mood, d_play_count, mood_gained
+
+    def apply_effects_fast(self, game_state: 'GameState') -> None:
+        """不生成日志的出牌，结果与apply_effects一致，供训练使用
+        
+        效果增量只取决于出牌前的集中和好调，按(集中, 好调)缓存，重复出现时直接叠加增量
+        """
+        # 消耗: 与apply_cost相同，元气为正时优先消耗元气，无视元气或剩余的部分扣体力
+        cost = self.cost
+        if self.bypass_spirit:
+            game_state.vitality -= cost
+        else:
+            spirit = game_state.spirit
+            if spirit > 0:
+                spirit_reduction = min(spirit, cost)
+                game_state.spirit = spirit - spirit_reduction
+                cost -= spirit_reduction
+            if cost > 0:
+                game_state.vitality -= cost
+
+        buffs = game_state.buffs
+        key = (buffs[B_FOCUS], buffs[B_MOOD])
+        deltas = self._delta_cache.get(key)
+        if deltas is None:
+            deltas = self._delta_cache[key] = self._compute_deltas(*key)
+        d_score, d_spirit, d_focus, d_mood, d_play_count, mood_gained = deltas
+
+        game_state.score += d_score
+        game_state.spirit += d_spirit
+        buffs[B_FOCUS] += d_focus
+        buffs[B_MOOD] += d_mood
+        buffs[B_PLAY] += d_play_count
+        if mood_gained:
+            game_state.new_buffs[B_MOOD] = True
+
+        game_state.update_alive()
+
 
 class GameState:
-    def __init__(self, deck: List[Card], num_rounds: int, target_score: int, 
-                 max_hand_size: int = 5, starting_vitality: int = 30):
+    def __init__(self, deck: List[int], num_rounds: int, target_score: int, 
+                 max_hand_size: int = 5, starting_vitality: int = 30, enable_log: bool = True):
         self.deck = deck
         self.num_rounds = num_rounds
         self.target_score = target_score
         self.max_hand_size = max_hand_size
         
+        self.starting_vitality = starting_vitality
+        
+        # 卡牌相关，均存卡牌ID，卡牌定义见CARD_DEFS
+        self.hand: List[int] = []
+        self.draw_pile: List[int] = []
+        self.discard_pile: List[int] = []
+        self.exhaust_pile: List[int] = []  # 新增消耗堆
+        
+        # Buff系统: 定长列表，按B_PLAY/B_FOCUS/B_MOOD下标访问
+        self.buffs: List[int] = [1, 0, 0]
+        
+        self.new_buffs: List[bool] = [False] * len(BUFF_NAMES)  # 仅好调使用
+        
+        self.log: List[str] = []
+        self.enable_log = enable_log  # 训练时关闭，跳过所有日志字符串的生成
+
+        # 洗牌优先级只有少数卡牌有，按优先级正负预先分组，首次洗牌时无需逐张查优先级
+        self._positive_priority_cards = [c for c in deck if CARD_DEFS[c].shuffle_priority > 0]
+        self._negative_priority_cards = [c for c in deck if CARD_DEFS[c].shuffle_priority < 0]
+        self._plain_cards = [c for c in deck if not CARD_DEFS[c].shuffle_priority]
+        # 分组只对整数优先级与按"随机值+优先级"排序等价，有小数优先级时退回原排序
+        self._integral_priorities = all(float(CARD_DEFS[c].shuffle_priority).is_integer() for c in deck)
+
+        self.reset()
+
+    def reset(self) -> None:
+        """原地重置为开局状态，复用已有的牌堆和buff容器，供训练时每局复用同一个实例"""
         # 游戏状态
         self.current_round = 1
         self.score = 0
         self.spirit = 0
-        self.vitality = starting_vitality
+        self.vitality = self.starting_vitality
         self.current_phase = Phase.TURN_START
+        self.update_alive()
         
-        # 卡牌相关
-        self.hand: List[Card] = []
-        self.draw_pile: List[Card] = []
-        self.discard_pile: List[Card] = []
-        self.exhaust_pile: List[Card] = []  # 新增消耗堆
-        
-        # Buff系统
-        self.buffs: Dict[str, int] = {
-            "出牌机会": 1,
-            "集中": 0,
-            "好调": 0
-        }
-        
-        self.new_buffs: Dict[str, bool] = {
-            "好调": False
-        }
+        self.hand.clear()
+        self.discard_pile.clear()
+        self.exhaust_pile.clear()
         
-        self.log: List[str] = []
+        self.buffs[B_PLAY] = 1
+        self.buffs[B_FOCUS] = 0
+        self.buffs[B_MOOD] = 0
+        self.new_buffs[B_MOOD] = False
         
-        self.is_first_shuffle = True
+        self.log.clear()
 
         self._initialize_draw_pile()
 
+    def update_alive(self) -> None:
+        """重新计算游戏是否继续: 回合未超、分数未达标且体力大于0
+        
+        只在回合、分数、体力可能变化处调用(出牌后、进入下一回合)，主循环只检查alive
+        """
+        self.alive = (self.vitality > 0 and self.score < self.target_score
+                      and self.current_round <= self.num_rounds)
+
+    def next_round(self) -> None:
+        """进入下一回合，分数和体力未变，只需再检查回合数"""
+        self.current_round += 1
+        if self.current_round > self.num_rounds:
+            self.alive = False
+
     def _initialize_draw_pile(self):
-        """初始化抽牌堆"""
-        self.draw_pile = self.deck.copy()
+        """初始化抽牌堆(每局开局洗牌)
         
-        # 为每张卡赋予一个随机值
-        for card in self.draw_pile:
-            card.shuffle_random = random.random()
-            
-        # 如果是首次洗牌，与原始优先级相加后排序
-        if self.is_first_shuffle:
-            self.draw_pile.sort(key=lambda x: x.shuffle_random + x.shuffle_priority, reverse=True)
-            # 首次洗牌后，重置所有优先级为0
-            for card in self.draw_pile:
-                card.shuffle_priority = 0
-            self.is_first_shuffle = False
-        else:
-            # 后续洗牌只使用随机值排序
-            self.draw_pile.sort(key=lambda x: x.shuffle_random, reverse=True)
+        优先级为正的卡牌放在牌堆底(最后抽到)，为负的放在牌堆顶(最先抽到)，
+        其余卡牌随机排列；优先级均为整数时按分组拼接，同优先级之间随机。
+        有小数优先级时按"随机值+优先级"从大到小排序，小数优先级只是偏向牌堆底/顶。
+        之后弃牌堆洗回抽牌堆时不再考虑优先级，见draw_cards
+        """
+        draw_pile = self.draw_pile
+        draw_pile.clear()
+        if not self._integral_priorities:
+            draw_pile.extend(self.deck)
+            draw_pile.sort(key=lambda card_id: random.random() + CARD_DEFS[card_id].shuffle_priority,
+                           reverse=True)
+            return
+        draw_pile.extend(self._plain_cards)
+        draw_pile.sort(key=_random_key)
+        if self._positive_priority_cards:
+            draw_pile[:0] = self._by_priority(self._positive_priority_cards)
+        if self._negative_priority_cards:
+            draw_pile.extend(self._by_priority(self._negative_priority_cards))
+
+    @staticmethod
+    def _by_priority(cards: List[int]) -> List[int]:
+        """按优先级从高到低排列，同优先级的卡牌之间随机"""
+        if len(cards) <= 1:
+            return cards
+        cards = sorted(cards, key=_random_key)
+        cards.sort(key=lambda card_id: CARD_DEFS[card_id].shuffle_priority, reverse=True)
+        return cards
             
     def draw_cards(self, count: int) -> None:
         """抽取指定数量的卡牌"""
@@ -207,48 +369,51 @@ class GameState:
             if len(self.draw_pile) == 0:
                 if len(self.discard_pile) == 0:
                     break
-                self.draw_pile = self.discard_pile.copy()
-                self.discard_pile.clear()
-                random.shuffle(self.draw_pile)
+                # 抽牌堆已空，直接与弃牌堆互换，不复制列表
+                self.draw_pile, self.discard_pile = self.discard_pile, self.draw_pile
+                self.draw_pile.sort(key=_random_key)
             
             if len(self.hand) < self.max_hand_size:
-                card = self.draw_pile.pop()
-                self.hand.append(card)
+                self.hand.append(self.draw_pile.pop())
 
     def reset_for_new_round(self) -> None:
         """重置回合相关状态"""
         self.discard_pile.extend(self.hand)
         self.hand.clear()
-        self.buffs["集中"] = 0
+        self.buffs[B_FOCUS] = 0
         self.defense = 0
 
     def handle_phase_start(self) -> List[str]:
         """处理回合开始阶段"""
-        log_entries = []
+        enable_log = self.enable_log
+        log_entries = [] if enable_log else _NO_LOGS
         
         # 处理好调buff
-        if self.buffs["好调"] > 0:
+        if self.buffs[B_MOOD] > 0:
             # 检查是否是新获得的buff
-            if self.new_buffs["好调"]:
+            if self.new_buffs[B_MOOD]:
                 # 跳过本次衰减，重置新获得状态
-                self.new_buffs["好调"] = False
-                log_entries.append(f"好调效果为新获得，跳过衰减")
+                self.new_buffs[B_MOOD] = False
+                if enable_log:
+                    log_entries.append(f"好调效果为新获得，跳过衰减")
             else:
                 # 正常衰减
-                self.buffs["好调"] -= 1
-                log_entries.append(f"好调效果衰减: {self.buffs['好调']+1} -> {self.buffs['好调']}")
+                self.buffs[B_MOOD] -= 1
+                if enable_log:
+                    log_entries.append(f"好调效果衰减: {self.buffs[B_MOOD]+1} -> {self.buffs[B_MOOD]}")
         
         # 重置出牌机会
-        self.buffs["出牌机会"] = 1
+        self.buffs[B_PLAY] = 1
         
         # 抽牌
         self.draw_cards(3)
-        log_entries.append("抽取3张卡牌")
+        if enable_log:
+            log_entries.append("抽取3张卡牌")
         
         return log_entries
 
 class Game:
-    def __init__(self, deck: List[Card], num_rounds: int, target_score: int, 
+    def __init__(self, deck: List[int], num_rounds: int, target_score: int, 
                  max_hand_size: int = 5, starting_vitality: int = 30):
         self.state = GameState(deck, num_rounds, target_score, 
                              max_hand_size, starting_vitality)
@@ -256,16 +421,17 @@ class Game:
     def display_hand(self) -> None:
         """显示当前手牌"""
         print("\n当前手牌:")
-        for i, card in enumerate(self.state.hand, 1):
+        for i, card_id in enumerate(self.state.hand, 1):
+            card = CARD_DEFS[card_id]
             effects_str = []
             for effect in card.effects:
                 if effect.type == EffectType.DAMAGE:
                     # 计算伤害加成
-                    focus_bonus = self.state.buffs.get("集中", 0)
+                    focus_bonus = self.state.buffs[B_FOCUS]
                     base_damage = effect.value + focus_bonus
-                    mood_bonus = self.state.buffs.get("好调", 0)
+                    mood_bonus = self.state.buffs[B_MOOD]
                     if mood_bonus > 0:
-                        actual_damage = math.floor(base_damage * 1.5)
+                        actual_damage = (base_damage * 3) >> 1
                         damage_str = f"{effect.type.value}{effect.value}"
                         if focus_bonus:
                             damage_str += f"{focus_bonus:+}"
@@ -294,20 +460,20 @@ class Game:
         print(f"当前分数: {self.state.score}")
         print(f"体力值: {self.state.vitality}")
         print(f"元气值: {self.state.spirit}")
-        print(f"剩余出牌次数: {self.state.buffs['出牌机会']}")
+        print(f"剩余出牌次数: {self.state.buffs[B_PLAY]}")
         print(f"消耗堆数量: {len(self.state.exhaust_pile)}")  # 新增显示消耗堆数量
         
         active_buffs = []
-        for buff_name, value in self.state.buffs.items():
-            if buff_name != "出牌机会" and value > 0:
+        for buff_name, value in zip(BUFF_NAMES, self.state.buffs):
+            if buff_name != BUFF_NAMES[B_PLAY] and value > 0:
                 active_buffs.append(f"{buff_name}: {value}")
         if active_buffs:
             print("当前效果: " + ", ".join(active_buffs))
 
         # 显示buff状态
         active_buffs = []
-        for buff_name, value in self.state.buffs.items():
-            if buff_name != "出牌机会" and value > 0:
+        for buff_name, value in zip(BUFF_NAMES, self.state.buffs):
+            if buff_name != BUFF_NAMES[B_PLAY] and value > 0:
                 active_buffs.append(f"{buff_name}: {value}")
         if active_buffs:
             print("当前效果: " + ", ".join(active_buffs))
@@ -333,7 +499,7 @@ class Game:
 
     def play_turn(self) -> None:
         """处理玩家回合逻辑"""
-        while self.state.buffs["出牌机会"] > 0 and self.state.hand:
+        while self.state.buffs[B_PLAY] > 0 and self.state.hand:
             self.display_game_status()
             self.display_hand()
             
@@ -344,7 +510,9 @@ class Game:
                 print("跳过出牌")
                 break
                 
-            selected_card = self.state.hand[choice - 1]
+            hand = self.state.hand
+            card_id = hand[choice - 1]
+            selected_card = CARD_DEFS[card_id]
             print(f"\n使用卡牌: {selected_card.name}")
             
             # 应用卡牌效果
@@ -353,19 +521,20 @@ class Game:
             for entry in log_entries:
                 print(entry)
             
-            # 处理卡牌去向
-            self.state.hand.remove(selected_card)
+            # 处理卡牌去向: 末尾的牌补到空位，O(1)删除
+            hand[choice - 1] = hand[-1]
+            hand.pop()
             if selected_card.exhaust:  # 根据消耗属性决定卡牌去向
-                self.state.exhaust_pile.append(selected_card)
+                self.state.exhaust_pile.append(card_id)
                 print(f"{selected_card.name} 已消耗")
             else:
-                self.state.discard_pile.append(selected_card)
+                self.state.discard_pile.append(card_id)
             
-            self.state.buffs["出牌机会"] -= 1
+            self.state.buffs[B_PLAY] -= 1
             
             if not self.state.hand:
                 print("\n手牌已用完!")
-            elif self.state.buffs["出牌机会"] <= 0:
+            elif self.state.buffs[B_PLAY] <= 0:
                 print("\n本回合出牌次数已用完!")
 
     def handle_turn_start(self) -> None:
@@ -388,9 +557,7 @@ class Game:
         print("提示: 卡牌消耗会优先消耗元气值，元气值不足时才会消耗体力值")
         print("      标记为'无视元气'的卡牌将直接消耗体力值")
         
-        while (self.state.current_round <= self.state.num_rounds and 
-               self.state.score < self.state.target_score and
-               self.state.vitality > 0):  # 添加体力值检查
+        while self.state.alive:  # 回合数、分数、体力检查合并为alive
             
             # 回合开始阶段
             self.state.current_phase = Phase.TURN_START
@@ -405,7 +572,7 @@ class Game:
             self.state.current_phase = Phase.TURN_END
             self.handle_turn_end()
             
-            self.state.current_round += 1
+            self.state.next_round()
 
         print("\n游戏结束!")
         if self.state.vitality <= 0:
@@ -416,8 +583,8 @@ class Game:
             print("很遗憾，您没有达到目标分数。")
         print(f"最终得分: {self.state.score}")
 
-def create_base_deck() -> List[Card]:
-    """创建基础卡组
+def create_base_deck() -> List[int]:
+    """创建基础卡组，返回卡牌ID列表，同一张卡按数量重复其ID
     示例:
     {
         "name": "卡牌名",
@@ -506,19 +673,18 @@ def create_base_deck() -> List[Card]:
         traits = card_data.get("traits", [])  # 默认无特殊特质
         shuffle_priority = card_data.get("shuffle_priority", 0)  # 默认优先级0
         
-        # 创建卡牌
-        card = Card(
+        # 创建并登记卡牌，重复调用时复用已登记的定义
+        card = register_card(Card(
             name=name,
             effects=effects,
             cost=cost,
             bypass_spirit="无视元气" in traits,
             shuffle_priority=shuffle_priority,
             exhaust="消耗" in traits
-        )
+        ))
         
         # 根据count添加卡牌
-        for _ in range(count):
-            deck.append(card)
+        deck.extend([card.card_id] * count)
             
     return deck
 # 示例运行
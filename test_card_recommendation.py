@@ -0,0 +1,52 @@
+import unittest
+
+# gamemain在模块末尾导入card_recommendation，需先导入gamemain
+from gamemain import GameState, create_base_deck, B_FOCUS, B_MOOD
+from card_recommendation import CardRecommendationAgent
+
+
+class StateKeyTest(unittest.TestCase):
+    def setUp(self):
+        self.agent = CardRecommendationAgent(create_base_deck())
+        self.state = GameState([], num_rounds=9, target_score=90, enable_log=False)
+
+    def key(self, **fields) -> int:
+        state = self.state
+        state.reset()
+        buffs = fields.pop("buffs", {})
+        for name, value in fields.items():
+            setattr(state, name, value)
+        for index, value in buffs.items():
+            state.buffs[index] = value
+        return self.agent.get_state_key(state)
+
+    def test_negative_fields_do_not_collide(self):
+        self.assertNotEqual(self.key(score=10, buffs={B_FOCUS: -1}),
+                            self.key(score=20, buffs={B_FOCUS: -1}))
+        self.assertNotEqual(self.key(spirit=-1, score=3), self.key(spirit=-1, score=4))
+        self.assertNotEqual(self.key(buffs={B_MOOD: -2}), self.key(buffs={B_MOOD: -2}, spirit=1))
+        self.assertNotEqual(self.key(vitality=-3, score=5), self.key(vitality=-3, score=6))
+
+    def test_out_of_range_field_raises(self):
+        with self.assertRaises(ValueError):
+            self.key(spirit=1 << 16)
+        with self.assertRaises(ValueError):
+            self.key(buffs={B_FOCUS: -(1 << 16)})
+        with self.assertRaises(ValueError):
+            self.key(score=1 << 32)
+
+
+class TrainTest(unittest.TestCase):
+    def test_non_positive_limits_are_accepted(self):
+        agent = CardRecommendationAgent(create_base_deck())
+        self.assertEqual(agent.train(num_episodes=2, num_rounds=0)['successful_episodes'], 0)
+        self.assertEqual(agent.train(num_episodes=2, target_score=0)['successful_episodes'], 2)
+
+    def test_too_many_rounds_raises(self):
+        agent = CardRecommendationAgent(create_base_deck())
+        with self.assertRaises(ValueError):
+            agent.train(num_episodes=1, num_rounds=1 << 16)
+
+
+if __name__ == "__main__":
+    unittest.main()
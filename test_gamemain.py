@@ -0,0 +1,85 @@
+import random
+import unittest
+
+from gamemain import Card, GameState, register_card, B_FOCUS, B_MOOD
+
+# 随机卡牌可用的效果类型，数值允许为负
+EFFECT_TYPES = ["伤害", "元气", "集中", "好调", "出牌机会"]
+
+
+def _make_state(spirit: int, focus: int, mood: int) -> GameState:
+    state = GameState([], num_rounds=9, target_score=1000, enable_log=False)
+    state.spirit = spirit
+    state.buffs[B_FOCUS] = focus
+    state.buffs[B_MOOD] = mood
+    return state
+
+
+def _snapshot(state: GameState):
+    return (state.score, state.spirit, state.vitality, list(state.buffs),
+            list(state.new_buffs), state.alive)
+
+
+class ApplyEffectsFastTest(unittest.TestCase):
+    def test_negative_spirit_cost(self):
+        """元气为负时不消耗元气，消耗全部扣体力"""
+        card = register_card(Card("测试负元气", [{"type": "元气", "value": -3}], cost=2))
+        slow = _make_state(0, 0, 0)
+        fast = _make_state(0, 0, 0)
+        for _ in range(2):
+            card.apply_effects(slow)
+            card.apply_effects_fast(fast)
+        self.assertEqual((slow.spirit, slow.vitality), (-6, 26))
+        self.assertEqual(_snapshot(fast), _snapshot(slow))
+
+    def test_matches_apply_effects(self):
+        """随机卡牌和随机(可为负的)元气、集中、好调下，快速路径与apply_effects结果一致"""
+        rng = random.Random(0)
+        cards = []
+        for i in range(50):
+            effects = [{"type": rng.choice(EFFECT_TYPES), "value": rng.randint(-5, 10)}
+                       for _ in range(rng.randint(1, 3))]
+            cards.append(register_card(Card(f"测试随机{i}", effects, cost=rng.randint(0, 8),
+                                            bypass_spirit=rng.random() < 0.2)))
+
+        for _ in range(500):
+            start = (rng.randint(-5, 10), rng.randint(-5, 10), rng.randint(-3, 3))
+            slow = _make_state(*start)
+            fast = _make_state(*start)
+            for _ in range(rng.randint(1, 6)):
+                card = rng.choice(cards)
+                card.apply_effects(slow)
+                card.apply_effects_fast(fast)
+                self.assertEqual(_snapshot(fast), _snapshot(slow), (card.name, start))
+
+
+class ShufflePriorityTest(unittest.TestCase):
+    def test_fractional_priority_biases_deal(self):
+        """小数优先级不报错，只让卡牌偏向牌堆底(最后抽到)"""
+        random.seed(0)
+        biased = register_card(Card("测试小数优先级", [], cost=0, shuffle_priority=0.5))
+        plain = register_card(Card("测试普通", [], cost=0))
+        deck = [plain.card_id] * 9 + [biased.card_id]
+        state = GameState(deck, num_rounds=9, target_score=90, enable_log=False)
+        bottom_half = 0
+        for _ in range(1000):
+            state.reset()
+            if state.draw_pile.index(biased.card_id) < len(deck) // 2:
+                bottom_half += 1
+        # 无偏时约500次，0.5的偏置下约875次
+        self.assertGreater(bottom_half, 750)
+
+    def test_priority_cards_dealt_first_and_last(self):
+        first = register_card(Card("测试先抽", [], cost=0, shuffle_priority=-1))
+        last = register_card(Card("测试后抽", [], cost=0, shuffle_priority=2.0))
+        plain = register_card(Card("测试普通", [], cost=0))
+        deck = [plain.card_id] * 5 + [first.card_id, last.card_id]
+        state = GameState(deck, num_rounds=9, target_score=90, enable_log=False)
+        for _ in range(20):
+            state.reset()
+            self.assertEqual(state.draw_pile[-1], first.card_id)
+            self.assertEqual(state.draw_pile[0], last.card_id)
+
+
+if __name__ == "__main__":
+    unittest.main()